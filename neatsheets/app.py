@@ -1,12 +1,22 @@
+import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Mapping, MutableMapping, Iterable, Any
+from typing import Mapping, MutableMapping, Iterable, Iterator, Any
 
-import tomli
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
 
 from neatsheets.language import Language
 from neatsheets.platform import Platform
 from neatsheets.sheet import Sheet
+from neatsheets.templating import get_template
+
+# Platforms by the name of their table in app.toml
+_platforms_by_key = {platform.value.lower(): platform for platform in Platform}
 
 
 class App:
@@ -41,55 +51,44 @@ class App:
     def to_html(self) -> str:
         """ Render app as HTML Neatsheet """
 
-        from jinja2 import Environment, PackageLoader, select_autoescape
-
-        env = Environment(loader=PackageLoader('neatsheets', encoding='UTF-16BE'), autoescape=select_autoescape())
-        template = env.get_template('app.html')
-        return template.render(app=self, platform=Platform.PC)
+        return get_template('app.html').render(app=self, platform=Platform.PC)
 
     @staticmethod
     def from_path(path: Path) -> 'App':
         """ Load app data from a path """
 
         config_path = path / 'app.toml'
-        with config_path.open('rb') as config_file:
-            config = tomli.load(config_file)
+        config = _load_app_config(config_path, config_path.stat().st_mtime_ns)
 
         logo = path / config['logo']
         display_name = config['display_name']
         display_name_full = config['display_name_full']
 
         sheets = {}
-        for platform in Platform:
-            if platform.value.lower() in config:
-                platform_config = config[platform.value.lower()]
-                data_path = path / platform_config['data']
+        for key, platform in _platforms_by_key.items():
+            if key in config:
+                data_path = path / config[key]['data']
                 sheets[platform] = Sheet.from_csv(data_path)
 
         return App(logo, display_name, display_name_full, sheets)
 
 
-class _AppManagerMeta(type):
-
-    __instance: dict[type, Any] = {}
-
-    def __init__(cls, name: str, bases: tuple[type, ...], attrs: dict[str, Any]):
-        type.__init__(cls, name, bases, attrs)
-        cls().load_all()
+@lru_cache(maxsize=None)
+def _load_app_config(config_path: Path, mtime_ns: int) -> dict[str, Any]:
+    """ Parse app config file (cached until the file's modification time changes) """
+    with config_path.open('rb') as config_file:
+        return tomllib.load(config_file)
 
-    def __call__(cls, *args, **kwargs):
-        """
-        Override call method of classes to implement singleton pattern
-        https://stackoverflow.com/questions/6760685/creating-a-singleton-in-python
-        """
 
-        if cls not in _AppManagerMeta.__instance:
-            _AppManagerMeta.__instance[cls] = type.__call__(cls, *args, **kwargs)
+def _scandir_dirs(path: str | os.PathLike) -> Iterator[os.DirEntry]:
+    """ Iterate over non-hidden subdirectories of a path, using scandir's cached entry metadata """
+    with os.scandir(path) as it:
+        for entry in it:
+            if not entry.name.startswith('.') and entry.is_dir():
+                yield entry
 
-        return _AppManagerMeta.__instance[cls]
 
-
-class AppManager(metaclass=_AppManagerMeta):
+class AppManager:
     """ Class to manage loading of App objects from file """
 
     def __init__(self, path: None | Path = None):
@@ -101,21 +100,26 @@ class AppManager(metaclass=_AppManagerMeta):
         return self.__path
 
     def load_all(self):
-        for language_path in [p for p in self.path.iterdir() if p.is_dir() and not p.name.startswith('.')]:
-            language = Language(language_path.name)
-            for app_path in [p for p in language_path.iterdir() if p.is_dir() and not p.name.startswith('.')]:
-                app_name = app_path.name
-                self.__apps[language][app_name] = App.from_path(app_path)
+        app_keys: list[tuple[Language, str]] = []
+        app_paths: list[Path] = []
+        for language_entry in _scandir_dirs(self.path):
+            language = Language(language_entry.name)
+            for app_entry in _scandir_dirs(language_entry.path):
+                app_keys.append((language, app_entry.name))
+                app_paths.append(Path(app_entry.path))
+
+        # Loading is dominated by file I/O, so overlap it across apps
+        with ThreadPoolExecutor() as executor:
+            for (language, app_name), app in zip(app_keys, executor.map(App.from_path, app_paths)):
+                self.__apps[language][app_name] = app
 
     def get_app(self, language: Language, app_name: str) -> App:
         return self.__apps[language][app_name]
 
 
-def test_from_path() -> None:
-    """ Test loading from path """
-    print(App.from_path(Path(__file__).parent / 'static' / 'apps' / 'en' / 'excel'))
-
-
-def test_load_all() -> None:
-    """ Test loading all apps from path (done automatically during AppManager init) """
-    AppManager()
+@cache
+def get_app_manager() -> AppManager:
+    """ Get the shared AppManager, loading all apps on first use """
+    app_manager = AppManager()
+    app_manager.load_all()
+    return app_manager
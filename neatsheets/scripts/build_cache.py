@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from neatsheets.sheet import Sheet
+
+
+def build_sheet_cache(path: Path = Path(__file__).parent.parent / 'static' / 'apps') -> None:
+    """ Write a pickled copy of every sheet CSV file under path, for Sheet.from_csv() to load instead """
+    for csv_path in path.glob('**/*.csv'):
+        pickle_path = csv_path.with_suffix('.pkl')
+        pickle_path.unlink(missing_ok=True)  # Always rebuild from the CSV file
+        Sheet.from_csv(csv_path).dump_pickle(pickle_path)
+
+
+if __name__ == '__main__':
+    build_sheet_cache()
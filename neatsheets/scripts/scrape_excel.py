@@ -1,167 +1,192 @@
 import re
+from types import MappingProxyType
 
 import requests
 from lxml import html
-from lxml.etree import ElementBase
+from lxml.etree import ElementBase, XPath
 
 from neatsheets.language import Language
-from neatsheets.sheet import Sheet, Platform
-from neatsheets.task import Keystroke, Shortcut, Task, KeystrokeSet
+from neatsheets.platform import Platform
+from neatsheets.sheet import Sheet
+from neatsheets.task import Shortcut, Task, KeystrokeSet, keystrokes_by_value
 from neatsheets.utils import titlecase
 
+# Separator between alternative shortcuts for the same task
+_shortcut_split_re = re.compile(r'\s+(?:or|On\sa\sMacBook,)\s+')
+
+# Precompiled XPath expressions used while walking the page
+_xpath_tables = XPath('//div[@id=$tab_id]//section/table')
+_xpath_rows = XPath('tbody/tr')
+_xpath_cells = XPath('td')
+_xpath_paras = XPath('p')
+_xpath_first_cell_paras = XPath('td[1]/p')
+_xpath_list_paras = XPath('td[2]/ul/li/p[1]')
+
+# Index of the page tab listing each platform's shortcuts
+_pick_tabs = MappingProxyType({Platform.PC: 1, Platform.Mac: 2})
+
+# Shortcuts that can't be parsed from the page, by task description
+_overrides = MappingProxyType({
+    'Move Selected Rows, Columns, or Cells': '⇧',
+    'Move to the Tell Me or Search Field on the Ribbon and Type a Search Term for Assistance or Help Content':
+        'alt+Q',
+    'Select the Active Tab on the Ribbon and Activate the Access Keys': 'alt or F10',
+    'Open a Context Menu': '⇧+F10 or ⊞',
+    'Move From One Group of Controls to Another': '^+←→',
+    'Cycle Through Floating Shapes, Such as Text Boxes or Images': '^+alt+5+tab',
+    'Scroll Horizontally': '^+⇧+⇳',
+    'Insert a Note': '⇧+F2',
+    'Insert a Threaded Comment': '^+⇧+F2',
+    'Expand Grouped Rows or Columns': '⇧+⇳',
+    'Collapse Grouped Rows or Columns': '⇧+⇳',
+})
+
+# Key names used on the page mapped to Keystroke values
+_keystroke_subs = MappingProxyType({
+    'COMMAND': '⌘',
+    'Windows Menu key': '⊞',
+    'Control': '^',
+    'Ctrl': '^',
+    'The Mac Delete button with a cross symbol on it.': '⌫',
+    'Backspace': '⌫',
+    'Delete\r\n\t\t\t(not the forward delete key   The Mac Delete button with a cross symbol on it. found on full '
+    'keyboards)': 'del',
+    'Delete': 'del',
+    'Alt': 'alt',
+    'Option': '⌥',
+    'Shift': '⇧',
+    'Hyphen (-)': '-',
+    'Hyphen': '-',
+    'Minus sign (-)': '-',
+    'Underscore (_)': '-',
+    'Equal sign ( = )': '=',
+    'Plus sign (+)': '=',
+    'Forward slash (/)': '/',
+    'Backward slash (\\)': '/',
+    'Spacebar': 'space',
+    'Return': '⏎',
+    'Enter': '⏎',
+    'Tab key': 'tab',
+    'Tab': 'tab',
+    'Esc': 'esc',
+    'Scroll lock': 'scroll\xa0lock',
+    'Up arrow key': '↑',
+    'Down arrow key': '↓',
+    'Left arrow key': '←',
+    'Right arrow key': '→',
+    'Arrow keys': '↑↓←→',
+    'Arrow key': '↑↓←→',
+    'Home': 'home',
+    'Fn': 'fn',
+    'End': 'end',
+    'Page down': 'pgdn',
+    'Page up': 'pgup',
+    ', then scroll the mouse wheel up for left, down for right': '+⇳',
+    'Semicolon (;)': ';',
+    'Colon (:)': ';',
+    'Inch mark/Straight double quote (")': '\'',
+    'Straight quotation mark (")': '\'',
+    'Grave accent (`)': '`',
+    'Period (.)': '.',
+    'Apostrophe (\')': '\'',
+    'Left bracket ([)': '[',
+    'Right bracket (])': ']',
+    'Left brace ({)': '[',
+    'Right brace (})': ']',
+    'Left angle bracket (<)': ',',
+    'Right angle bracket (>)': '.',
+    'Tilde sign (~)': '`',
+    'Tilde (~)': '`',
+    'Exclamation point (!)': '1',
+    'At sign (@)': '2',
+    'At symbol (@)': '2',
+    'Number sign (#)': '3',
+    'Dollar sign ($)': '4',
+    'Percent sign (%)': '5',
+    'Caret sign (^)': '6',
+    'Caret (^)': '6',
+    'Ampersand sign (&)': '7',
+    'Asterisk sign (*)': '8',
+    'Asterisk (*)': '8',
+    'Left parenthesis (()': '9',
+    'Right parenthesis ())': '0',
+    'Zero (0)': '0',
+    ', ': '+',  # Parse sequential combinations (e.g. Alt+H, A, C -> alt + H + A + C)
+    ' alone': '',
+})
+
+# Apply all substitutions in a single pass, trying longer keys first (e.g. 'Tab key' before 'Tab')
+_keystroke_subs_re = re.compile('|'.join(re.escape(k) for k in sorted(_keystroke_subs, key=len, reverse=True)))
+
 
 def scrape_excel_keyboard_shortcuts() -> tuple[Sheet, Sheet]:
     """ Scrape excel keyboard shortcuts and return a Sheet for each platform (PC/Mac) """
     url = 'https://support.microsoft.com/en-us/office/keyboard-shortcuts-in-excel-1798d9d5-842a-42b8-9c99-9b7213f0040f'
 
-    pick_tabs = {Platform.PC: 1, Platform.MAC: 2}
-
-    overrides = {
-        'Move Selected Rows, Columns, or Cells': '⇧',
-        'Move to the Tell Me or Search Field on the Ribbon and Type a Search Term for Assistance or Help Content':
-            'alt+Q',
-        'Select the Active Tab on the Ribbon and Activate the Access Keys': 'alt or F10',
-        'Open a Context Menu': '⇧+F10 or ⊞',
-        'Move From One Group of Controls to Another': '^+←→',
-        'Cycle Through Floating Shapes, Such as Text Boxes or Images': '^+alt+5+tab',
-        'Scroll Horizontally': '^+⇧+⇳',
-        'Insert a Note': '⇧+F2',
-        'Insert a Threaded Comment': '^+⇧+F2',
-        'Expand Grouped Rows or Columns': '⇧+⇳',
-        'Collapse Grouped Rows or Columns': '⇧+⇳',
-    }
-
-    keystroke_subs = {
-        '\xa0': ' ',
-        'COMMAND': '⌘',
-        'Windows Menu key': '⊞',
-        'Control': '^',
-        'Ctrl': '^',
-        'The Mac Delete button with a cross symbol on it.': '⌫',
-        'Backspace': '⌫',
-        'Delete\r\n\t\t\t(not the forward delete key   ⌫ found on full keyboards)': 'del',
-        'Delete': 'del',
-        'Alt': 'alt',
-        'Option': '⌥',
-        'Shift': '⇧',
-        'Hyphen (-)': '-',
-        'Hyphen': '-',
-        'Minus sign (-)': '-',
-        'Underscore (_)': '-',
-        'Equal sign ( = )': '=',
-        'Plus sign (+)': '=',
-        'Forward slash (/)': '/',
-        'Backward slash (\\)': '/',
-        'Spacebar': 'space',
-        'Return': '⏎',
-        'Enter': '⏎',
-        'Tab key': 'tab',
-        'Tab': 'tab',
-        'Esc': 'esc',
-        'Scroll lock': 'scroll\xa0lock',
-        'Up arrow key': '↑',
-        'Down arrow key': '↓',
-        'Left arrow key': '←',
-        'Right arrow key': '→',
-        'Arrow keys': '↑↓←→',
-        'Arrow key': '↑↓←→',
-        'Home': 'home',
-        'Fn': 'fn',
-        'End': 'end',
-        'Page down': 'pgdn',
-        'Page up': 'pgup',
-        ', then scroll the mouse wheel up for left, down for right': '+⇳',
-        'Semicolon (;)': ';',
-        'Colon (:)': ';',
-        'Inch mark/Straight double quote (")': '\'',
-        'Straight quotation mark (")': '\'',
-        'Grave accent (`)': '`',
-        'Period (.)': '.',
-        'Apostrophe (\')': '\'',
-        'Left bracket ([)': '[',
-        'Right bracket (])': ']',
-        'Left brace ({)': '[',
-        'Right brace (})': ']',
-        'Left angle bracket (<)': ',',
-        'Right angle bracket (>)': '.',
-        'Tilde sign (~)': '`',
-        'Tilde (~)': '`',
-        'Exclamation point (!)': '1',
-        'At sign (@)': '2',
-        'At symbol (@)': '2',
-        'Number sign (#)': '3',
-        'Dollar sign ($)': '4',
-        'Percent sign (%)': '5',
-        'Caret sign (^)': '6',
-        'Caret (^)': '6',
-        'Ampersand sign (&)': '7',
-        'Asterisk sign (*)': '8',
-        'Asterisk (*)': '8',
-        'Left parenthesis (()': '9',
-        'Right parenthesis ())': '0',
-        'Zero (0)': '0',
-        ', ': '+',  # Parse sequential combinations (e.g. Alt+H, A, C -> alt + H + A + C)
-        ' alone': '',
-    }
-
     def _parse_shortcut(text) -> Shortcut:
         try:
-            # Map to standard representations
-            for k_old, k_new in keystroke_subs.items():
-                text = text.replace(k_old, k_new)
+            # Map to standard representations (non-breaking spaces first, as the keys use plain spaces)
+            text = _keystroke_subs_re.sub(lambda m: _keystroke_subs[m.group(0)], text.replace('\xa0', ' '))
 
             # Parse as single keystroke or set of keystrokes
             keystrokes = []
             for k in text.split('+'):
-                try:
-                    keystrokes.append(Keystroke(k))
-                except ValueError:
-                    keystrokes.append(KeystrokeSet(*tuple(Keystroke(kk) for kk in k)))
+                if k in keystrokes_by_value:
+                    keystrokes.append(keystrokes_by_value[k])
+                else:
+                    keystrokes.append(KeystrokeSet(*(keystrokes_by_value[kk] for kk in k)))
 
             return Shortcut(*keystrokes)
         except Exception as e:
             print(e)
 
     def _parse_row(tr: ElementBase) -> tuple[str, tuple[Shortcut, ...]]:
-        td_desc, td_shortcut = tr.xpath('td')
-        p_desc = td_desc.xpath('p')[0]
-        desc_text = (p_desc.text or '') + ''.join((el.text or '') + (el.tail or '') for el in p_desc.getchildren())
+        td_desc, td_shortcut = _xpath_cells(tr)
+        p_desc = _xpath_paras(td_desc)[0]
+        desc_text = p_desc.text_content()
         desc = titlecase(desc_text[:-1])
-        if desc in overrides:
-            shortcut_text = overrides[desc]
+        if desc in _overrides:
+            shortcut_text = _overrides[desc]
         else:
             shortcut_text = ' '.join(
-                ((p.text or '') + ''.join(el.get('alt', '') + (el.tail or '') for el in p.getchildren()))
-                for p in td_shortcut.xpath('p'))
+                (p.text or '') + ''.join([el.get('alt', '') + (el.tail or '') for el in p])
+                for p in _xpath_paras(td_shortcut))
 
-        shortcut_text_lines = re.split(r'\s+(?:or|On\sa\sMacBook,)\s+', shortcut_text.strip())
+        shortcut_text_lines = _shortcut_split_re.split(shortcut_text.strip())
         shortcuts = tuple(_parse_shortcut(line) for line in shortcut_text_lines)
         return desc, shortcuts
 
     def _parse_list_row(tr: ElementBase) -> list[tuple[str, Shortcut]]:
-        list_paras = tr.xpath('td[2]/ul/li/p[1]')
+        list_paras = _xpath_list_paras(tr)
         result: list[tuple[str, Shortcut]] = []
         for p in list_paras:
-            text = (p.text or '') + ''.join((el.text or '') + (el.tail or '') for el in p.getchildren())
+            text = p.text_content()
             if ': ' in text:
                 shortcut_text, desc_text = text.split(': ')
             else:
                 desc_text = text
-                shortcut_text = tr.xpath('td[1]/p')[0].text
+                shortcut_text = _xpath_first_cell_paras(tr)[0].text
             desc = titlecase(desc_text[:-1])
-            if desc in overrides:
-                shortcut_text = overrides[desc]
+            if desc in _overrides:
+                shortcut_text = _overrides[desc]
             shortcut = _parse_shortcut(shortcut_text)
             result.append((desc, shortcut))
 
         return result
 
     def _parse_sheet(content: ElementBase, platform: Platform) -> Sheet:
-        tables = content.xpath(f'//div[@id="PickTab-supTabControlContent-{pick_tabs[platform]}"]//section/table')
+        tables = set(_xpath_tables(content, tab_id=f'PickTab-supTabControlContent-{_pick_tabs[platform]}'))
         tasks = []
-        for table in tables:
-            section = titlecase(table.xpath('preceding-sibling::*[self::h2 or self::h3]')[0].text)
-            rows = table.xpath('tbody/tr')
+        heading = None
+        # Walk the document once, carrying the latest heading forward to the tables that follow it
+        for el in content.iter('h2', 'h3', 'table'):
+            if el.tag != 'table':
+                heading = el
+                continue
+            if el not in tables:
+                continue
+            section = titlecase(heading.text)
+            rows = _xpath_rows(el)
             if section not in ('Function Keys', 'Other Useful Shortcut Keys'):
                 tasks.extend([Task(section, desc, shortcuts, False)
                               for desc, shortcuts in [_parse_row(row) for row in rows]])
@@ -176,7 +201,7 @@ def scrape_excel_keyboard_shortcuts() -> tuple[Sheet, Sheet]:
     content = html.fromstring(page.content)
 
     pc_sheet = _parse_sheet(content, Platform.PC)
-    mac_sheet = _parse_sheet(content, Platform.MAC)
+    mac_sheet = _parse_sheet(content, Platform.Mac)
 
     return pc_sheet, mac_sheet
 
@@ -1,147 +1,116 @@
-from collections import defaultdict
-from csv import DictReader, DictWriter
+import codecs
+import csv
+import io
+import pickle
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Mapping
+from sys import intern
+from types import MappingProxyType
+from typing import Iterable, Mapping
 
-from lxml import html
+from neatsheets.task import Task
+from neatsheets.templating import get_template
 
-from neatsheets.task import Task, Shortcut, Keystroke, KeystrokeRange, KeystrokeSet
-from neatsheets.utils import assert_etrees_equal
+# Column layout of sheet CSV files
+_csv_columns = ('section', 'desc', 'shortcut', 'important')
+
+# Format version stored with sheet pickles. Bump it whenever the layout of Sheet, Task, Shortcut or the keystroke
+# classes changes, so that from_csv() ignores pickles written by older code and parses the CSV file instead.
+#   1: initial format
+#   2: Task, Shortcut and keystroke classes store a precomputed hash, and pickle through __reduce__
+_pickle_version = 2
 
 
 class Sheet:
     """ Class representing a cheat sheet """
 
-    def __init__(self, tasks: Mapping[str, list[Task]]):
-        self.__tasks = tasks
+    __slots__ = ('__tasks', '__sections')
+
+    def __init__(self, tasks: Mapping[str, Iterable[Task]]):
+        # Read-only, as from_csv() hands the same (cached) Sheet to every caller
+        self.__tasks = MappingProxyType({section: tuple(section_tasks) for section, section_tasks in tasks.items()})
+        self.__sections = tuple(self.__tasks.items())  # (section, tasks) pairs in display order, for rendering
 
     @property
-    def tasks(self) -> Mapping[str, list[Task]]:
+    def tasks(self) -> Mapping[str, tuple[Task, ...]]:
         return self.__tasks
 
     def __str__(self) -> str:
         return (f'Sheet{{'
-                f'tasks={self.__tasks}}}')
+                f'tasks={dict(self.__tasks)}}}')
+
+    def __reduce__(self) -> tuple[type, tuple[dict[str, tuple[Task, ...]]]]:
+        # Rebuild through __init__ when unpickling, as the read-only tasks mapping can't be pickled itself
+        return Sheet, (dict(self.__tasks), )
 
     def write_csv(self, path: Path) -> None:
         """ Write sheet to CSV file """
 
-        with path.open('w', encoding='UTF-16BE') as csv_file:
-            writer = DictWriter(csv_file, ('section', 'desc', 'shortcut', 'important'))
-            writer.writeheader()
-            for section in self.__tasks:
-                for task in self.__tasks[section]:
-                    writer.writerow({
-                        'section': section,
-                        **task.to_csv_dict()
-                    })
+        buffer = io.StringIO(newline='')
+        writer = csv.writer(buffer)
+        writer.writerow(_csv_columns)
+        writer.writerows((section, *task.to_csv_row())
+                         for section, section_tasks in self.__tasks.items() for task in section_tasks)
+
+        # Encode and write the whole file at once, with a BOM so from_csv can detect byte order
+        path.write_bytes(codecs.BOM_UTF16_BE + buffer.getvalue().encode('UTF-16BE'))
+
+    def dump_pickle(self, path: Path) -> None:
+        """ Write sheet to pickle file, which from_csv() will load in place of a CSV file of the same name """
+        with path.open('wb') as pickle_file:
+            pickle.dump((_pickle_version, self), pickle_file, protocol=5)
 
     def to_html(self) -> str:
         """ Render sheet as HTML """
 
-        from jinja2 import Environment, PackageLoader, select_autoescape
+        return get_template('sheet.html').render(sections=self.__sections)
 
-        env = Environment(loader=PackageLoader('neatsheets', encoding='UTF-16'), autoescape=select_autoescape())
-        template = env.get_template('sheet.html')
-        return template.render(tasks=self.tasks)
+    @staticmethod
+    def load_pickle(path: Path) -> 'Sheet':
+        """ Load sheet from pickle file (raises ValueError if it was written by an incompatible version) """
+        with path.open('rb') as pickle_file:
+            contents = pickle.load(pickle_file)
+        if not (type(contents) is tuple and len(contents) == 2 and contents[0] == _pickle_version and
+                type(contents[1]) is Sheet):
+            raise ValueError(f'Not a version {_pickle_version} sheet pickle: {path}')
+        return contents[1]
 
     @staticmethod
     def from_csv(csv_path: Path) -> 'Sheet':
-        """ Build sheet from a CSV file """
-
-        tasks = defaultdict(list)
-
-        with csv_path.open('r', encoding='utf-16') as csv_file:
-            reader = DictReader(csv_file)
-            for row in reader:
-                section = row.pop('section')
-                task = Task.parse(**row)
-                tasks[section].append(task)
-
-        return Sheet(tasks)
-
-
-def test_build_sheet() -> None:
-    """ Test build_sheet() method """
-    print(Sheet.from_csv(Path(__file__).parent / 'static' / 'apps' / 'en' / 'firefox' / 'firefox_mac.csv'))
-
-
-def test_sheet_to_html() -> None:
-    """ Test to_html() method """
-
-    sheet = Sheet({
-        'Commands': [
-            Task('Look around', (Shortcut(KeystrokeSet(Keystroke.W, Keystroke.A, Keystroke.S, Keystroke.D)), ), True),
-            Task('Create a new workbook', (Shortcut(Keystroke.CTRL, Keystroke.N), ), True),
-            Task('Open an existing workbook',
-                 (Shortcut(Keystroke.CTRL, Keystroke.O), Shortcut(Keystroke.CTRL, Keystroke.BACKSPACE)), True),
-        ],
-        'Surprises': [
-            Task('I dunno', (Shortcut(Keystroke.CTRL, KeystrokeRange(Keystroke.ZERO, Keystroke.NINE)), ), True),
-        ],
-    })
-
-    expected = """<h2>Commands</h2>
-<table>
-    <tbody>
-        <tr>
-            <td>
-                Look around
-            </td>
-            <td>
-                <span class="key">W</span>
-                <span class="key">A</span>
-                <span class="key">S</span>
-                <span class="key">D</span>
-                <br>
-            </td>
-        </tr>
-        <tr>
-            <td>
-                Create a new workbook
-            </td>
-            <td>
-                <span class="key">^</span>
-                 + 
-                <span class="key">N</span>
-                <br>
-            </td>
-        </tr>
-        <tr>
-            <td>
-                Open an existing workbook
-            </td>
-            <td>
-                <span class="key">^</span>
-                 + 
-                <span class="key">O</span>
-                <br>
-                <span class="key">^</span>
-                 + 
-                <span class="key">⌫</span>
-                <br>
-            </td>
-        </tr>
-    </tbody>
-</table>
-<h2>Surprises</h2>
-<table>
-    <tbody>
-        <tr>
-            <td>
-                I dunno
-            </td>
-            <td>
-                <span class="key">^</span>
-                 + 
-                <span class="key">0</span>
-                 to
-                <span class="key">9</span>
-                <br>
-            </td>
-        </tr>
-    </tbody>
-</table>
-"""
-
-    assert_etrees_equal(html.fromstring(sheet.to_html()), html.fromstring(expected))
+        """ Build sheet from a CSV file, or from its pickled copy (see dump_pickle()) if that is at least as new """
+        return _load_sheet(csv_path, csv_path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _load_sheet(csv_path: Path, mtime_ns: int) -> Sheet:
+    """ Load sheet from CSV file or its pickled copy (cached until the CSV file's modification time changes) """
+    pickle_path = csv_path.with_suffix('.pkl')
+    try:
+        if pickle_path.stat().st_mtime_ns >= mtime_ns:
+            return Sheet.load_pickle(pickle_path)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError):
+        # Missing, truncated or corrupt pickle, or one written by an older version (including references to classes
+        # that have since moved or been removed): the CSV file is the source of truth
+        pass
+    return _parse_csv(csv_path)
+
+
+def _parse_csv(csv_path: Path) -> Sheet:
+    """ Parse sheet from CSV file """
+
+    tasks: dict[str, list[Task]] = {}
+    parse_task = Task.parse
+
+    # Read and decode the whole (small) file in one go, rather than chunk by chunk through a text stream
+    reader = csv.reader(io.StringIO(csv_path.read_bytes().decode('utf-16'), newline=''))
+    column_index = {name: i for i, name in enumerate(next(reader))}
+    section_i, desc_i, shortcut_i, important_i = (column_index[name] for name in _csv_columns)
+    # Rows are stored grouped by section (see write_csv), so each section's tasks are built in one batch.
+    # Text is interned so repeats across sheets (e.g. the Mac and PC sheets of an app) share one string.
+    for section, rows in groupby(reader, key=itemgetter(section_i)):
+        section_tasks = [parse_task(intern(row[desc_i]), row[shortcut_i], row[important_i]) for row in rows]
+        tasks.setdefault(intern(section), []).extend(section_tasks)
+
+    return Sheet(tasks)
@@ -1,6 +1,7 @@
 import re
 from enum import Enum
-from typing import Iterator, Any
+from functools import lru_cache
+from typing import Iterator, Any, Mapping
 
 
 class Keystroke(Enum):
@@ -90,12 +91,26 @@ class Keystroke(Enum):
     MOUSE_SCROLL = '⇳'
 
 
+# Separator between alternative shortcuts in the CSV shortcut column. A comma is also a keystroke (e.g. '⇧ ⌘ ,'),
+# but keystrokes are separated by spaces, so a comma key always starts the field or follows a space, while a
+# separating comma always directly follows the last key of the previous shortcut
+_shortcut_separator = re.compile(r'(?<=\S),\s+')
+
+# Keystrokes by CSV representation, for parsing without going through Enum lookup
+keystrokes_by_value: Mapping[str, Keystroke] = {k.value: k for k in Keystroke}
+
+
+# Sheets are cached as pickles of the classes below: changing their __slots__ or __reduce__ needs a bump of
+# neatsheets.sheet._pickle_version, or old pickles will load as half-built objects
 class KeystrokeRange:
     """ Class representing a range of possible keystrokes, e.g. 0-9, A-Z """
 
+    __slots__ = ('__start', '__end', '__hash')
+
     def __init__(self, start: Keystroke, end: Keystroke):
         self.__start = start
         self.__end = end
+        self.__hash = hash((start, end))
 
     @property
     def start(self) -> Keystroke:
@@ -116,19 +131,26 @@ class KeystrokeRange:
                 f'end={self.__end}}}')
 
     def __eq__(self, other: Any) -> bool:
-        return (type(other) == KeystrokeRange and
-                self.__start == other.start and
-                self.__end == other.end)
+        return self is other or (type(other) is KeystrokeRange and
+                                 self.__start == other.__start and
+                                 self.__end == other.__end)
 
     def __hash__(self) -> int:
-        return hash((self.__start, self.__end))
+        return self.__hash
+
+    def __reduce__(self) -> tuple[type, tuple[Keystroke, Keystroke]]:
+        # Rebuild through __init__ when unpickling, since string hashes differ between processes
+        return KeystrokeRange, (self.__start, self.__end)
 
 
 class KeystrokeSet:
     """ Class representing a set of possible keystrokes, e.g. '↑, ↓, ←, or →'"""
 
+    __slots__ = ('__keystrokes', '__hash')
+
     def __init__(self, *keystrokes: Keystroke):
         self.__keystrokes = keystrokes
+        self.__hash = hash(keystrokes)
 
     @property
     def keystrokes(self) -> tuple[Keystroke]:
@@ -144,18 +166,25 @@ class KeystrokeSet:
                 f'keystrokes={self.__keystrokes}}}')
 
     def __eq__(self, other: Any) -> bool:
-        return (type(other) == KeystrokeSet and
-                self.__keystrokes == other.keystrokes)
+        return self is other or (type(other) is KeystrokeSet and
+                                 self.__keystrokes == other.__keystrokes)
 
     def __hash__(self) -> int:
-        return hash(self.__keystrokes)
+        return self.__hash
+
+    def __reduce__(self) -> tuple[type, tuple[Keystroke, ...]]:
+        # Rebuild through __init__ when unpickling, since string hashes differ between processes
+        return KeystrokeSet, self.__keystrokes
 
 
 class Shortcut:
     """ Combination of keystrokes """
 
+    __slots__ = ('__keystrokes', '__hash')
+
     def __init__(self, *keystrokes: Keystroke | KeystrokeRange | KeystrokeSet):
         self.__keystrokes = keystrokes
+        self.__hash = hash(keystrokes)
 
     @property
     def keystrokes(self) -> tuple[Keystroke | KeystrokeRange | KeystrokeSet, ...]:
@@ -170,11 +199,15 @@ class Shortcut:
                 f'keystrokes={self.__keystrokes}}}')
 
     def __eq__(self, other) -> bool:
-        return (type(other) == Shortcut and
-                self.__keystrokes == other.keystrokes)
+        return self is other or (type(other) is Shortcut and
+                                 self.__keystrokes == other.__keystrokes)
 
     def __hash__(self) -> int:
-        return hash(self.__keystrokes)
+        return self.__hash
+
+    def __reduce__(self) -> tuple[type, tuple[Keystroke | KeystrokeRange | KeystrokeSet, ...]]:
+        # Rebuild through __init__ when unpickling, since string hashes differ between processes
+        return Shortcut, self.__keystrokes
 
     def __iter__(self) -> Iterator[Keystroke | KeystrokeRange | KeystrokeSet]:
         return iter(self.__keystrokes)
@@ -182,28 +215,38 @@ class Shortcut:
     @staticmethod
     def parse(csv_str: str) -> 'Shortcut':
         """ Parse combination of keystrokes from CSV file as Shortcut """
-        keystrokes: list[Keystroke | KeystrokeRange | KeystrokeSet] = []
-        for s in csv_str.split(' '):
-            try:
-                keystrokes.append(Keystroke(s))
-            except ValueError as e:
-                try:
-                    keystrokes.append(KeystrokeRange(*(Keystroke(k) for k in s.split('-'))))
-                except ValueError as _:
-                    try:
-                        keystrokes.append(KeystrokeSet(*(Keystroke(k) for k in s)))
-                    except ValueError as _:
-                        raise e
-
-        return Shortcut(*keystrokes)
+        return _parse_shortcut(csv_str)
+
+
+@lru_cache(maxsize=8192)
+def _parse_shortcut(csv_str: str) -> Shortcut:
+    """ Shortcut.parse() implementation, cached as the same shortcuts recur across sheets (and are immutable) """
+    keystrokes: list[Keystroke | KeystrokeRange | KeystrokeSet] = []
+    for s in csv_str.split(' '):
+        # Try each interpretation by lookup, rather than raising and catching a ValueError for each one that fails
+        if s in keystrokes_by_value:
+            keystrokes.append(keystrokes_by_value[s])
+            continue
+        range_ends = s.split('-')
+        if len(range_ends) == 2 and all(k in keystrokes_by_value for k in range_ends):
+            keystrokes.append(KeystrokeRange(*(keystrokes_by_value[k] for k in range_ends)))
+        elif all(k in keystrokes_by_value for k in s):
+            keystrokes.append(KeystrokeSet(*(keystrokes_by_value[k] for k in s)))
+        else:
+            raise ValueError(f'{s!r} is not a valid Keystroke')
+
+    return Shortcut(*keystrokes)
 
 
 class Task:
 
+    __slots__ = ('__desc', '__shortcut', '__important', '__hash')
+
     def __init__(self, desc: str, shortcut: tuple[Shortcut, ...], important: bool):
         self.__desc = desc
         self.__shortcut = shortcut
         self.__important = important
+        self.__hash = hash((desc, shortcut, important))
 
     @property
     def desc(self) -> str:
@@ -217,12 +260,11 @@ class Task:
     def important(self) -> bool:
         return self.__important
 
-    def to_csv_dict(self) -> dict[str, str]:
-        return {
-            'desc': self.__desc,
-            'shortcut': ', '.join(s.to_csv_str() for s in self.__shortcut),
-            'important': 'true' if self.__important else 'false',
-        }
+    def to_csv_row(self) -> tuple[str, str, str]:
+        """ Format as (desc, shortcut, important) columns for storage in CSV file """
+        return (self.__desc,
+                ', '.join(s.to_csv_str() for s in self.__shortcut),
+                'true' if self.__important else 'false')
 
     def __str__(self) -> str:
         return (f'Task{{'
@@ -231,38 +273,21 @@ class Task:
                 f'important={self.__important}}}')
 
     def __eq__(self, other: Any) -> bool:
-        return (type(other) == Task and
-                self.__desc == other.desc and
-                self.__shortcut == other.shortcut and
-                self.__important == other.important)
+        return self is other or (type(other) is Task and
+                                 self.__desc == other.__desc and
+                                 self.__shortcut == other.__shortcut and
+                                 self.__important == other.__important)
 
     def __hash__(self) -> int:
-        return hash((self.__desc, self.__shortcut, self.__important))
+        return self.__hash
+
+    def __reduce__(self) -> tuple[type, tuple[str, tuple[Shortcut, ...], bool]]:
+        # Rebuild through __init__ when unpickling, since string hashes differ between processes
+        return Task, (self.__desc, self.__shortcut, self.__important)
 
     @staticmethod
     def parse(desc: str, shortcut: str, important: str) -> 'Task':
         """ Parse columns from CSV file as Task """
-        shortcut = tuple(Shortcut.parse(s) for s in re.split(r'\s*,\s*', shortcut))
-        important = important.lower() == 'true'
+        shortcut = tuple(Shortcut.parse(s) for s in _shortcut_separator.split(shortcut.strip()))
+        important = important.strip().lower() == 'true'
         return Task(desc, shortcut, important)
-
-
-def test_parse_shortcut() -> None:
-    """ Test parse() function """
-    assert Shortcut.parse('⌘ S') == Shortcut(Keystroke.CMD, Keystroke.S)
-    assert Shortcut.parse('^ 0-8') == Shortcut(Keystroke.CTRL, KeystrokeRange(Keystroke.ZERO, Keystroke.EIGHT))
-    assert Shortcut.parse('scroll\xa0lock') == Shortcut(Keystroke.SCROLL_LOCK)
-    assert Shortcut.parse('↑↓←→') == Shortcut(KeystrokeSet(Keystroke.UP, Keystroke.DOWN, Keystroke.LEFT,
-                                                           Keystroke.RIGHT))
-
-
-def test_parse_task() -> None:
-    """ Test parse() function """
-    assert Task.parse('Back', '⌘ ←, ⌘ [', 'true') == \
-           Task('Back',
-                (Shortcut(Keystroke.CMD, Keystroke.LEFT), Shortcut(Keystroke.CMD, Keystroke.LEFT_BRACKET)),
-                True)
-    assert Task.parse('Scroll Lock', 'scroll\xa0lock', 'false') == \
-           Task('Scroll Lock',
-                (Shortcut(Keystroke.SCROLL_LOCK), ),
-                False)
@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, PackageLoader, Template, select_autoescape
+
+
+def _get_bytecode_cache() -> BytecodeCache | None:
+    """ Get a cache of compiled templates on disk, or None if no (safe) cache directory is available """
+    # The cache is only an optimization: without it, templates are compiled on first use as before
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """ Get the Jinja environment shared by all renders (built once per process) """
+    # Compiled templates are also cached on disk (in a per-user temp directory) to skip compilation on cold start
+    return Environment(loader=PackageLoader('neatsheets'), autoescape=select_autoescape(),
+                       cache_size=-1, auto_reload=False, bytecode_cache=_get_bytecode_cache())
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """ Get a compiled template from the package templates directory """
+    return get_environment().get_template(name)
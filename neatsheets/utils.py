@@ -1,37 +1,46 @@
-from lxml import etree
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from neatsheets.language import Language
 
+if TYPE_CHECKING:
+    # lxml is only needed by tests, so isn't imported at runtime
+    from lxml import etree
 
-def assert_etrees_equal(actual: etree, expected: etree) -> None:
+
+def assert_etrees_equal(actual: 'etree._Element', expected: 'etree._Element') -> None:
     """ Assert equality of two lxml element trees """
     # https://stackoverflow.com/questions/7905380/testing-equivalence-of-xml-etree-elementtree
-    assert actual.tag == expected.tag, \
-        f'Expected tag: {repr(expected.tag)}, actual tag: {repr(actual.tag)}'
-    assert actual.text == expected.text, \
-        f'Expected text: {repr(expected.text)}, actual text: {repr(actual.text)}'
-    assert actual.tail == expected.tail, \
-        f'Expected tail: {repr(expected.tail)}, actual tail: {repr(actual.tail)}'
-    assert actual.attrib == expected.attrib, \
-        f'Expected attrib: {expected.attrib}, actual attrib: {actual.attrib}'
-    assert len(actual) == len(expected), \
-        f'Expected len: {len(expected)}, actual len: {len(actual)}'
-    for elem_actual, elem_expected in zip(actual, expected):
-        assert_etrees_equal(elem_actual, elem_expected)
+    # Walk both trees with an explicit stack (in document order) instead of recursing per element
+    stack = [(actual, expected)]
+    while stack:
+        actual, expected = stack.pop()
+        assert actual.tag == expected.tag, \
+            f'Expected tag: {repr(expected.tag)}, actual tag: {repr(actual.tag)}'
+        assert actual.text == expected.text, \
+            f'Expected text: {repr(expected.text)}, actual text: {repr(actual.text)}'
+        assert actual.tail == expected.tail, \
+            f'Expected tail: {repr(expected.tail)}, actual tail: {repr(actual.tail)}'
+        assert actual.attrib == expected.attrib, \
+            f'Expected attrib: {expected.attrib}, actual attrib: {actual.attrib}'
+        assert len(actual) == len(expected), \
+            f'Expected len: {len(expected)}, actual len: {len(actual)}'
+        stack.extend(zip(reversed(actual), reversed(expected)))
 
 
 _titlecase_exceptions = {
-    Language.EN: [
+    Language.EN: frozenset([
         # Conjunctions
         'and', 'as', 'but', 'for', 'if', 'nor', 'or', 'so', 'yet',
         # Articles
         'a', 'an', 'the',
         # Prepositions
         'as', 'at', 'by', 'for', 'in', 'of', 'off', 'on', 'per', 'to', 'up', 'via',
-    ]
+    ])
 }
 
 
+@lru_cache(maxsize=4096)
 def titlecase(title: str, language: Language = Language.EN) -> str:
     """ Titlecase a sentence (i.e. capitalize all words except for conjunctions, articles, and prepositions """
     # https://apastyle.apa.org/style-grammar-guidelines/capitalization/title-case
@@ -44,6 +53,8 @@ def titlecase(title: str, language: Language = Language.EN) -> str:
     words = title.split()
     assert len(words) >= 1
 
-    words = [words[0].capitalize()] + [word.capitalize() if not word in exceptions else word for word in words[1:]]
+    # Only words already in lower case are exempted: a capitalised 'As' or 'To' is taken to be deliberate (e.g. the
+    # 'Save As' and 'Go To' dialogs), as is the first word of a sentence within a description
+    words = [words[0].capitalize()] + [word if word in exceptions else word.capitalize() for word in words[1:]]
 
     return ' '.join(words)
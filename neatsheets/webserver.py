@@ -2,14 +2,13 @@ from pathlib import Path
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from jinja2 import FileSystemLoader
 
-from neatsheets.app import AppManager
+from neatsheets.app import get_app_manager
 from neatsheets.language import Language
 from neatsheets.platform import Platform
+from neatsheets.templating import get_template
 
 
 root = Path(__file__).parent
@@ -17,17 +16,22 @@ root = Path(__file__).parent
 api = FastAPI()
 api.mount('/static', StaticFiles(directory=(root / 'static')), name='static')
 
-templates = Jinja2Templates(directory=(root / 'templates'),
-                            loader=FileSystemLoader((root / 'templates'), encoding='UTF-16BE'))
+
+@api.on_event('startup')
+def load_apps():
+    """ Load all app data up front, so the first request for each sheet doesn't pay for parsing it """
+    get_app_manager()
 
 
 @api.get("/{language}/sheet/{app_name}", response_class=HTMLResponse)
 @api.get("/{language}/sheet/{app_name}.html", response_class=HTMLResponse)
 async def sheet(request: Request, language: Language, app_name: str, platform: Platform = Platform.Mac):
     """ Render Neatsheet """
-    app = AppManager().get_app(language, app_name)
-    return templates.TemplateResponse('app.html', {
-        'request': request, 'root': root, 'app': app, 'selected_platform': platform})
+    app = get_app_manager().get_app(language, app_name)
+    # Stream the page out as it renders, rather than building the whole document in memory first
+    stream = get_template('app.html').stream(request=request, root=root, app=app, selected_platform=platform)
+    stream.enable_buffering()
+    return StreamingResponse(stream, media_type='text/html')
 
 
 def main():
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import neatsheets
+from neatsheets.app import App, AppManager
+from neatsheets.language import Language
+from neatsheets.platform import Platform
+
+apps_path = Path(neatsheets.__file__).parent / 'static' / 'apps'
+
+
+def test_from_path() -> None:
+    """ Test loading from path """
+    print(App.from_path(apps_path / 'en' / 'excel'))
+
+
+def test_load_all() -> None:
+    """ Test loading all apps from path """
+    app_manager = AppManager()
+    app_manager.load_all()
+    assert app_manager.get_app(Language.EN, 'excel').platforms == {Platform.Mac, Platform.PC}
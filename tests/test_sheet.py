@@ -0,0 +1,171 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+import neatsheets
+from neatsheets.sheet import Sheet
+from neatsheets.task import Task, Shortcut, Keystroke, KeystrokeRange, KeystrokeSet
+from neatsheets.utils import assert_etrees_equal
+
+apps_path = Path(neatsheets.__file__).parent / 'static' / 'apps'
+
+
+def test_build_sheet() -> None:
+    """ Test build_sheet() method """
+    print(Sheet.from_csv(apps_path / 'en' / 'firefox' / 'firefox_mac.csv'))
+
+
+def test_build_sheet_cached() -> None:
+    """ Test from_csv() reuses the parsed sheet while the file is unchanged """
+    csv_path = apps_path / 'en' / 'firefox' / 'firefox_mac.csv'
+    assert Sheet.from_csv(csv_path) is Sheet.from_csv(csv_path)
+
+
+def test_build_sheet_read_only() -> None:
+    """ Test the (shared) sheet returned by from_csv() can't be modified through its tasks mapping """
+    sheet = Sheet.from_csv(apps_path / 'en' / 'firefox' / 'firefox_mac.csv')
+    with pytest.raises(TypeError):
+        sheet.tasks['Surprises'] = ()
+
+
+def test_write_csv(tmp_path: Path) -> None:
+    """ Test write_csv() output can be read back by from_csv() """
+    sheet = Sheet.from_csv(apps_path / 'en' / 'firefox' / 'firefox_mac.csv')
+    csv_path = tmp_path / 'firefox_mac.csv'
+    sheet.write_csv(csv_path)
+    assert Sheet.from_csv(csv_path).tasks == sheet.tasks
+
+
+def test_dump_pickle(tmp_path: Path) -> None:
+    """ Test dump_pickle() output can be read back by load_pickle() """
+    sheet = Sheet.from_csv(apps_path / 'en' / 'firefox' / 'firefox_mac.csv')
+    pickle_path = tmp_path / 'firefox_mac.pkl'
+    sheet.dump_pickle(pickle_path)
+    assert Sheet.load_pickle(pickle_path).tasks == sheet.tasks
+
+
+def test_build_sheet_from_pickle(tmp_path: Path) -> None:
+    """ Test from_csv() loads a pickled copy that is at least as new as the CSV file, and ignores an older one """
+    csv_path = tmp_path / 'sheet.csv'
+    pickle_path = tmp_path / 'sheet.pkl'
+    Sheet({'Commands': [Task('Save', (Shortcut(Keystroke.CMD, Keystroke.S), ), True)]}).write_csv(csv_path)
+    pickled = Sheet({'Commands': [Task('Save (pickled)', (Shortcut(Keystroke.CMD, Keystroke.S), ), True)]})
+    pickled.dump_pickle(pickle_path)
+
+    csv_mtime_ns = csv_path.stat().st_mtime_ns
+    os.utime(pickle_path, ns=(csv_mtime_ns, csv_mtime_ns))
+    assert Sheet.from_csv(csv_path).tasks == pickled.tasks
+
+    os.utime(pickle_path, ns=(csv_mtime_ns - 1, csv_mtime_ns - 1))
+    os.utime(csv_path, ns=(csv_mtime_ns + 1, csv_mtime_ns + 1))  # New CSV mtime, so the sheet isn't served cached
+    assert Sheet.from_csv(csv_path).tasks['Commands'][0].desc == 'Save'
+
+
+def test_build_sheet_stale_pickle(tmp_path: Path) -> None:
+    """ Test from_csv() parses the CSV file in place of a pickle written by an older (or unknown) version """
+    csv_path = tmp_path / 'sheet.csv'
+    pickle_path = tmp_path / 'sheet.pkl'
+    sheet = Sheet({'Commands': [Task('Save', (Shortcut(Keystroke.CMD, Keystroke.S), ), True)]})
+    sheet.write_csv(csv_path)
+    with pickle_path.open('wb') as pickle_file:
+        pickle.dump((-1, sheet), pickle_file)
+
+    with pytest.raises(ValueError):
+        Sheet.load_pickle(pickle_path)
+    assert Sheet.from_csv(csv_path).tasks == sheet.tasks
+
+
+def test_build_sheet_corrupt_pickle(tmp_path: Path) -> None:
+    """ Test from_csv() parses the CSV file in place of a truncated pickle """
+    csv_path = tmp_path / 'sheet.csv'
+    pickle_path = tmp_path / 'sheet.pkl'
+    sheet = Sheet({'Commands': [Task('Save', (Shortcut(Keystroke.CMD, Keystroke.S), ), True)]})
+    sheet.write_csv(csv_path)
+    sheet.dump_pickle(pickle_path)
+    pickle_path.write_bytes(pickle_path.read_bytes()[:20])
+
+    assert Sheet.from_csv(csv_path).tasks == sheet.tasks
+
+
+def test_sheet_to_html() -> None:
+    """ Test to_html() method """
+    html = pytest.importorskip('lxml.html')
+
+    sheet = Sheet({
+        'Commands': [
+            Task('Look around', (Shortcut(KeystrokeSet(Keystroke.W, Keystroke.A, Keystroke.S, Keystroke.D)), ), True),
+            Task('Create a new workbook', (Shortcut(Keystroke.CTRL, Keystroke.N), ), True),
+            Task('Open an existing workbook',
+                 (Shortcut(Keystroke.CTRL, Keystroke.O), Shortcut(Keystroke.CTRL, Keystroke.BACKSPACE)), True),
+        ],
+        'Surprises': [
+            Task('I dunno', (Shortcut(Keystroke.CTRL, KeystrokeRange(Keystroke.ZERO, Keystroke.NINE)), ), True),
+        ],
+    })
+
+    expected = """<h2>Commands</h2>
+<table>
+    <tbody>
+        <tr>
+            <td>
+                Look around
+            </td>
+            <td>
+                <span class="key">W</span>
+                <span class="key">A</span>
+                <span class="key">S</span>
+                <span class="key">D</span>
+                <br>
+            </td>
+        </tr>
+        <tr>
+            <td>
+                Create a new workbook
+            </td>
+            <td>
+                <span class="key">^</span>
+                 + 
+                <span class="key">N</span>
+                <br>
+            </td>
+        </tr>
+        <tr>
+            <td>
+                Open an existing workbook
+            </td>
+            <td>
+                <span class="key">^</span>
+                 + 
+                <span class="key">O</span>
+                <br>
+                <span class="key">^</span>
+                 + 
+                <span class="key">⌫</span>
+                <br>
+            </td>
+        </tr>
+    </tbody>
+</table>
+<h2>Surprises</h2>
+<table>
+    <tbody>
+        <tr>
+            <td>
+                I dunno
+            </td>
+            <td>
+                <span class="key">^</span>
+                 + 
+                <span class="key">0</span>
+                 to
+                <span class="key">9</span>
+                <br>
+            </td>
+        </tr>
+    </tbody>
+</table>
+"""
+
+    assert_etrees_equal(html.fromstring(sheet.to_html()), html.fromstring(expected))
@@ -0,0 +1,45 @@
+from neatsheets.task import Task, Shortcut, Keystroke, KeystrokeRange, KeystrokeSet
+
+
+def test_parse_shortcut() -> None:
+    """ Test parse() function """
+    assert Shortcut.parse('⌘ S') == Shortcut(Keystroke.CMD, Keystroke.S)
+    assert Shortcut.parse('^ 0-8') == Shortcut(Keystroke.CTRL, KeystrokeRange(Keystroke.ZERO, Keystroke.EIGHT))
+    assert Shortcut.parse('scroll\xa0lock') == Shortcut(Keystroke.SCROLL_LOCK)
+    assert Shortcut.parse('↑↓←→') == Shortcut(KeystrokeSet(Keystroke.UP, Keystroke.DOWN, Keystroke.LEFT,
+                                                           Keystroke.RIGHT))
+
+
+def test_parse_task() -> None:
+    """ Test parse() function """
+    assert Task.parse('Back', '⌘ ←, ⌘ [', 'true') == \
+           Task('Back',
+                (Shortcut(Keystroke.CMD, Keystroke.LEFT), Shortcut(Keystroke.CMD, Keystroke.LEFT_BRACKET)),
+                True)
+    assert Task.parse('Scroll Lock', 'scroll\xa0lock', 'false') == \
+           Task('Scroll Lock',
+                (Shortcut(Keystroke.SCROLL_LOCK), ),
+                False)
+    assert Task.parse('Save', '⌘ S', ' TRUE ').important
+    assert Task.parse('Decrease Font Size', '⇧ ⌘ ,', 'false') == \
+           Task('Decrease Font Size',
+                (Shortcut(Keystroke.SHIFT, Keystroke.CMD, Keystroke.COMMA), ),
+                False)
+    assert Task.parse('Preferences', '⌘ ,, ^ ,', 'false').shortcut == \
+           (Shortcut(Keystroke.CMD, Keystroke.COMMA), Shortcut(Keystroke.CTRL, Keystroke.COMMA))
+
+
+def test_task_csv_row() -> None:
+    """ Test to_csv_row() output is parsed back to the same Task """
+    task = Task('Decrease Font Size', (Shortcut(Keystroke.SHIFT, Keystroke.CMD, Keystroke.COMMA), ), False)
+    assert task.to_csv_row() == ('Decrease Font Size', '⇧ ⌘ ,', 'false')
+    assert Task.parse(*task.to_csv_row()) == task
+
+
+def test_task_csv_row_comma() -> None:
+    """ Test to_csv_row() output round-trips with a comma keystroke anywhere in a shortcut """
+    for shortcut in ((Shortcut(Keystroke.CMD, Keystroke.COMMA, Keystroke.SHIFT), ),
+                     (Shortcut(Keystroke.COMMA, Keystroke.CMD), ),
+                     (Shortcut(Keystroke.COMMA), Shortcut(Keystroke.CMD, Keystroke.COMMA), Shortcut(Keystroke.COMMA))):
+        task = Task('Comma', shortcut, False)
+        assert Task.parse(*task.to_csv_row()) == task
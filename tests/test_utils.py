@@ -0,0 +1,10 @@
+from neatsheets.utils import titlecase
+
+
+def test_titlecase() -> None:
+    """ Test titlecase() function """
+    assert titlecase('move to the end of a row') == 'Move to the End of a Row'
+    assert titlecase('display the Save As dialog box') == 'Display the Save As Dialog Box'
+    assert titlecase('zoom In') == 'Zoom In'
+    assert titlecase('open the Power Pivot window. For more information') == \
+           'Open the Power Pivot Window. For More Information'